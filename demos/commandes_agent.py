@@ -9,6 +9,14 @@ required_open_webui_version: 0.3.9
 import requests
 from typing import Callable, Any, Awaitable
 from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import threading
+import asyncio
+import random
+import time
 import json
 
 
@@ -23,42 +31,304 @@ class Tools:
             description="Your Redmine API key (found in My Account > API access key)",
         )
 
+        TURN_TIMEOUT: float = Field(
+            default=30.0,
+            description="Maximum time in seconds allowed for all Redmine calls made while answering one message",
+        )
+        REQUEST_TIMEOUT: float = Field(
+            default=10.0,
+            description="Maximum time in seconds for a single HTTP attempt",
+        )
+        MAX_RETRIES: int = Field(
+            default=3,
+            description="Number of retries on 429/5xx responses and network errors",
+        )
+        HEDGE_DELAY: float = Field(
+            default=0.5,
+            description="Delay in seconds before a duplicate GET is sent, until enough latencies are known to use the p95",
+        )
+        BREAKER_THRESHOLD: int = Field(
+            default=5,
+            description="Consecutive failures before the circuit breaker opens",
+        )
+        BREAKER_COOLDOWN: float = Field(
+            default=30.0,
+            description="Time in seconds the circuit breaker stays open before a probe request is allowed",
+        )
+        CACHE_SIZE: int = Field(
+            default=256,
+            description="Number of GET responses kept to answer while the circuit breaker is open",
+        )
+
     def __init__(self):
         self.valves = self.Valves()
+        self._executor = ThreadPoolExecutor(max_workers=8)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=200)
+        self._cache = OrderedDict()
+        self._turn_deadlines = {}
+        self._breaker_failures = 0
+        self._breaker_opened_at = None
+        self._half_open_probe_in_flight = False
+        self._probe_owner = None
+        self.metrics = {
+            "breaker_state": "closed",
+            "breaker_opens": 0,
+            "short_circuited": 0,
+            "cache_hits": 0,
+            "retries": 0,
+            "hedges_sent": 0,
+            "hedges_won": 0,
+        }
 
-    def _make_request(self, method: str, endpoint: str, data: dict = None) -> dict:
-        """Helper method to make API requests to Redmine"""
+    def _turn_deadline(self, __metadata__: dict = {}) -> float:
+        """Deadline shared by every Redmine call made while answering the same message"""
+        now = time.monotonic()
+        message_id = (__metadata__ or {}).get("message_id")
+        if message_id is None:
+            return now + self.valves.TURN_TIMEOUT
+
+        with self._lock:
+            # Forget turns that ended long ago
+            for key, deadline in list(self._turn_deadlines.items()):
+                if deadline < now - self.valves.TURN_TIMEOUT:
+                    del self._turn_deadlines[key]
+            return self._turn_deadlines.setdefault(
+                message_id, now + self.valves.TURN_TIMEOUT
+            )
+
+    def _hedge_delay(self) -> float:
+        """p95 of recent GET latencies, or the configured delay while there is too little data"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 20:
+            return self.valves.HEDGE_DELAY
+        return latencies[int(len(latencies) * 0.95) - 1]
+
+    def _breaker_allows(self) -> bool:
+        """Return False while the circuit breaker is open, let a single probe through after the cooldown"""
+        with self._lock:
+            if self._breaker_opened_at is None:
+                return True
+            if (
+                not self._half_open_probe_in_flight
+                and time.monotonic() - self._breaker_opened_at
+                >= self.valves.BREAKER_COOLDOWN
+            ):
+                self._half_open_probe_in_flight = True
+                self._probe_owner = threading.get_ident()
+                self.metrics["breaker_state"] = "half_open"
+                return True
+            self.metrics["short_circuited"] += 1
+            return False
+
+    def _breaker_is_open(self) -> bool:
+        """Return True if the circuit breaker is open or half-open, without side effects"""
+        with self._lock:
+            return self._breaker_opened_at is not None
+
+    def _release_probe(self):
+        """Free the probe slot if the current call took it but never got an answer"""
+        with self._lock:
+            if (
+                self._half_open_probe_in_flight
+                and self._probe_owner == threading.get_ident()
+            ):
+                self._half_open_probe_in_flight = False
+                self._probe_owner = None
+                self.metrics["breaker_state"] = "open"
+
+    def _record_result(self, success: bool):
+        """Update the circuit breaker after an attempt"""
+        with self._lock:
+            probe = self._half_open_probe_in_flight
+            self._half_open_probe_in_flight = False
+            self._probe_owner = None
+            if success:
+                self._breaker_failures = 0
+                self._breaker_opened_at = None
+                self.metrics["breaker_state"] = "closed"
+                return
+            self._breaker_failures += 1
+            if probe or (
+                self._breaker_opened_at is None
+                and self._breaker_failures >= self.valves.BREAKER_THRESHOLD
+            ):
+                self._breaker_opened_at = time.monotonic()
+                self.metrics["breaker_state"] = "open"
+                self.metrics["breaker_opens"] += 1
+
+    def _cache_get(self, url: str):
+        """Return the cached response for a GET, or None"""
+        with self._lock:
+            if url not in self._cache:
+                return None
+            self._cache.move_to_end(url)
+            self.metrics["cache_hits"] += 1
+            return self._cache[url]
+
+    def _cache_put(self, url: str, result: dict):
+        """Store a GET response, evicting the least recently used ones"""
+        with self._lock:
+            self._cache[url] = result
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.valves.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _unavailable(self, method: str, url: str, error: str) -> dict:
+        """Answer from the cache when Redmine cannot be reached"""
+        cached = self._cache_get(url) if method == "GET" else None
+        if cached is not None:
+            return {**cached, "stale": True}
+        return {"error": error, "status": "failed"}
+
+    def _retry_after(self, response) -> float:
+        """Delay in seconds requested by the Retry-After header, 0 if absent"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return 0.0
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return 0.0
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def _send(self, method: str, url: str, headers: dict, data: dict, timeout: float):
+        """Send a single HTTP attempt and record its latency"""
+        start = time.monotonic()
+        response = requests.request(
+            method, url, headers=headers, json=data, timeout=timeout
+        )
+        if method == "GET" and response.status_code < 500:
+            with self._lock:
+                self._latencies.append(time.monotonic() - start)
+        return response
+
+    def _hedged_get(self, url: str, headers: dict, timeout: float, deadline: float):
+        """Send a GET and a duplicate after the p95 delay, keep the first answer"""
+        primary = self._executor.submit(self._send, "GET", url, headers, None, timeout)
+        hedge_delay = min(self._hedge_delay(), deadline - time.monotonic())
+        done, _ = wait([primary], timeout=max(0.0, hedge_delay))
+        if done:
+            return primary.result()
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout(f"No response from {url}")
+        hedge = self._executor.submit(
+            self._send, "GET", url, headers, None, min(timeout, remaining)
+        )
+        with self._lock:
+            self.metrics["hedges_sent"] += 1
+
+        pending = {primary, hedge}
+        error = requests.exceptions.Timeout(f"No response from {url}")
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.metrics["hedges_won"] += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _make_request(
+        self, method: str, endpoint: str, data: dict = None, deadline: float = None
+    ) -> dict:
+        """Helper method to make API requests to Redmine, blocking: run it in a thread"""
         url = f"{self.valves.REDMINE_URL}{endpoint}"
         headers = {
             "X-Redmine-API-Key": self.valves.REDMINE_API_KEY,
             "Content-Type": "application/json",
         }
+        if deadline is None:
+            deadline = self._turn_deadline()
+        # Only requests that can safely be sent twice are retried on 5xx and network errors
+        idempotent = method in ("GET", "PUT", "DELETE")
+
+        if not self._breaker_allows():
+            return self._unavailable(
+                method, url, "Redmine is unavailable (circuit open)"
+            )
 
         try:
-            if method == "GET":
-                response = requests.get(url, headers=headers)
-            elif method == "POST":
-                response = requests.post(url, headers=headers, json=data)
-            elif method == "PUT":
-                response = requests.put(url, headers=headers, json=data)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=headers)
-
-            response.raise_for_status()
-
-            if response.status_code == 204:  # No content
-                return {
-                    "status": "success",
-                    "message": "Operation completed successfully",
-                }
-
-            return response.json() if response.text else {"status": "success"}
-        except requests.exceptions.RequestException as e:
-            return {"error": str(e), "status": "failed"}
+            error = "Deadline exceeded"
+            for attempt in range(self.valves.MAX_RETRIES + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                timeout = min(self.valves.REQUEST_TIMEOUT, remaining)
+                retry_after = 0.0
+
+                try:
+                    if method == "GET":
+                        response = self._hedged_get(url, headers, timeout, deadline)
+                    else:
+                        response = self._send(method, url, headers, data, timeout)
+                except requests.exceptions.RequestException as e:
+                    self._record_result(False)
+                    error = str(e)
+                    if not idempotent:
+                        break
+                else:
+                    if response.status_code == 429 or response.status_code >= 500:
+                        self._record_result(False)
+                        error = f"{response.status_code} Error for url: {url}"
+                        if response.status_code == 429:
+                            retry_after = self._retry_after(response)
+                        elif not idempotent:
+                            break
+                    else:
+                        self._record_result(True)
+                        try:
+                            response.raise_for_status()
+                        except requests.exceptions.RequestException as e:
+                            return {"error": str(e), "status": "failed"}
+
+                        if response.status_code == 204:  # No content
+                            return {
+                                "status": "success",
+                                "message": "Operation completed successfully",
+                            }
+
+                        result = (
+                            response.json() if response.text else {"status": "success"}
+                        )
+                        if method == "GET":
+                            self._cache_put(url, result)
+                        return result
+
+                if self._breaker_is_open():
+                    return self._unavailable(method, url, error)
+                if attempt == self.valves.MAX_RETRIES:
+                    break
+                # Exponential backoff with full jitter on top of Retry-After
+                backoff = retry_after + random.uniform(0, min(8.0, 0.25 * 2**attempt))
+                if retry_after >= deadline - time.monotonic():
+                    break
+                with self._lock:
+                    self.metrics["retries"] += 1
+                time.sleep(max(0.0, min(backoff, deadline - time.monotonic())))
+
+            return {"error": error, "status": "failed"}
+        finally:
+            self._release_probe()
 
     async def list_projects(
         self,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -66,6 +336,8 @@ class Tools:
 
         :return: JSON string with list of projects
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -73,7 +345,9 @@ class Tools:
             }
         )
 
-        result = self._make_request("GET", "/projects.json")
+        result = await asyncio.to_thread(
+            self._make_request, "GET", "/projects.json", deadline=deadline
+        )
 
         await __event_emitter__(
             {
@@ -90,6 +364,7 @@ class Tools:
         status: str = "open",
         limit: int = 25,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -100,6 +375,8 @@ class Tools:
         :param limit: Maximum number of issues to return (default 25)
         :return: JSON string with list of issues
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -111,7 +388,9 @@ class Tools:
         if project_id:
             endpoint += f"&project_id={project_id}"
 
-        result = self._make_request("GET", endpoint)
+        result = await asyncio.to_thread(
+            self._make_request, "GET", endpoint, deadline=deadline
+        )
 
         await __event_emitter__(
             {"type": "status", "data": {"description": "Issues fetched", "done": True}}
@@ -123,6 +402,7 @@ class Tools:
         self,
         issue_id: int,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -131,6 +411,8 @@ class Tools:
         :param issue_id: The issue ID number
         :return: JSON string with issue details
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -141,7 +423,9 @@ class Tools:
             }
         )
 
-        result = self._make_request("GET", f"/issues/{issue_id}.json")
+        result = await asyncio.to_thread(
+            self._make_request, "GET", f"/issues/{issue_id}.json", deadline=deadline
+        )
 
         await __event_emitter__(
             {"type": "status", "data": {"description": "Issue fetched", "done": True}}
@@ -160,6 +444,7 @@ class Tools:
         due_date: str = None,
         done_ratio: int = None,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -175,6 +460,8 @@ class Tools:
         :param done_ratio: Completion percentage (0-100)
         :return: JSON string with created issue details
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -199,7 +486,9 @@ class Tools:
         if done_ratio is not None:
             issue_data["issue"]["done_ratio"] = done_ratio
 
-        result = self._make_request("POST", "/issues.json", issue_data)
+        result = await asyncio.to_thread(
+            self._make_request, "POST", "/issues.json", issue_data, deadline=deadline
+        )
 
         await __event_emitter__(
             {"type": "status", "data": {"description": "Issue created", "done": True}}
@@ -219,6 +508,7 @@ class Tools:
         done_ratio: int = None,
         notes: str = None,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -235,6 +525,8 @@ class Tools:
         :param notes: Add a note/comment to the issue (optional)
         :return: JSON string with operation result
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -264,7 +556,13 @@ class Tools:
         if notes:
             issue_data["issue"]["notes"] = notes
 
-        result = self._make_request("PUT", f"/issues/{issue_id}.json", issue_data)
+        result = await asyncio.to_thread(
+            self._make_request,
+            "PUT",
+            f"/issues/{issue_id}.json",
+            issue_data,
+            deadline=deadline,
+        )
 
         await __event_emitter__(
             {"type": "status", "data": {"description": "Issue updated", "done": True}}
@@ -276,6 +574,7 @@ class Tools:
         self,
         issue_id: int,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -284,6 +583,8 @@ class Tools:
         :param issue_id: The issue ID to delete
         :return: JSON string with operation result
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -294,7 +595,9 @@ class Tools:
             }
         )
 
-        result = self._make_request("DELETE", f"/issues/{issue_id}.json")
+        result = await asyncio.to_thread(
+            self._make_request, "DELETE", f"/issues/{issue_id}.json", deadline=deadline
+        )
 
         await __event_emitter__(
             {"type": "status", "data": {"description": "Issue deleted", "done": True}}
@@ -305,6 +608,7 @@ class Tools:
     async def list_users(
         self,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -312,6 +616,8 @@ class Tools:
 
         :return: JSON string with list of users
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -319,7 +625,9 @@ class Tools:
             }
         )
 
-        result = self._make_request("GET", "/users.json")
+        result = await asyncio.to_thread(
+            self._make_request, "GET", "/users.json", deadline=deadline
+        )
 
         await __event_emitter__(
             {"type": "status", "data": {"description": "Users fetched", "done": True}}
@@ -334,6 +642,7 @@ class Tools:
         from_date: str = None,
         to_date: str = None,
         __user__: dict = {},
+        __metadata__: dict = {},
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> str:
         """
@@ -345,6 +654,8 @@ class Tools:
         :param to_date: End date in YYYY-MM-DD format
         :return: JSON string with time entries
         """
+        deadline = self._turn_deadline(__metadata__)
+
         await __event_emitter__(
             {
                 "type": "status",
@@ -366,7 +677,9 @@ class Tools:
 
         endpoint += "&".join(params)
 
-        result = self._make_request("GET", endpoint)
+        result = await asyncio.to_thread(
+            self._make_request, "GET", endpoint, deadline=deadline
+        )
 
         await __event_emitter__(
             {
@@ -377,5 +690,26 @@ class Tools:
 
         return json.dumps(result, indent=2)
 
+    async def get_resilience_metrics(
+        self,
+        __user__: dict = {},
+        __event_emitter__: Callable[[dict], Awaitable[None]] = None,
+    ) -> str:
+        """
+        Get circuit breaker state and hedged request statistics for Redmine calls.
+
+        :return: JSON string with resilience metrics
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+        metrics["hedge_win_rate"] = (
+            metrics["hedges_won"] / metrics["hedges_sent"]
+            if metrics["hedges_sent"]
+            else 0.0
+        )
+        metrics["hedge_delay"] = self._hedge_delay()
+
+        return json.dumps(metrics, indent=2)
+
 redmine = Tools.__init__()
 Tools.update_issue(issue_id=7099, done_ratio=90,)
\ No newline at end of file
@@ -9,8 +9,13 @@ required_open_webui_version: 0.3.9
 import os
 import requests
 from datetime import datetime
+from typing import Callable, Awaitable, Iterator
 import random
 import json
+import csv
+import io
+import math
+import unicodedata
 
 class Tools:
     def __init__(self):
@@ -178,20 +183,7 @@ Valable jusqu'au: {quote['valid_until']}"""
             if not self.quotes_db:
                 return "📭 Aucun devis dans le système pour le moment."
 
-            filtered_quotes = self.quotes_db
-            status_mapping = {
-                "tous": "all",
-                "en attente": "En Attente",
-                "approuvé": "Approuvé",
-                "rejeté": "Rejeté",
-                "terminé": "Terminé",
-            }
-
-            if status.lower() != "tous":
-                status_filter = status_mapping.get(status.lower(), status)
-                filtered_quotes = [
-                    q for q in self.quotes_db if q["status"] == status_filter
-                ]
+            filtered_quotes = self._filter_quotes(status)
 
             if not filtered_quotes:
                 return f"📭 Aucun devis trouvé avec le statut '{status}'."
@@ -208,6 +200,156 @@ Valable jusqu'au: {quote['valid_until']}"""
         except Exception as e:
             return f"❌ Erreur lors du listage des devis: {str(e)}"
 
+    def import_quotes(
+        self, content: str, format: str = "auto", __user__: dict = {}
+    ) -> str:
+        """
+        Importer en une seule fois un lot de devis collé depuis un tableur (CSV) ou en JSON.
+        Colonnes attendues: client, produit, quantité, prix unitaire.
+        :param content: Le contenu CSV (séparateur virgule, point-virgule ou tabulation) ou JSON (liste d'objets ou une ligne JSON par devis).
+        :param format: Le format du contenu (auto, csv, json). Par défaut 'auto'.
+        :return: Résumé de l'import ou liste des lignes invalides.
+        """
+        try:
+            if not content.strip():
+                return "📭 Aucun devis à importer."
+
+            try:
+                rows = self._parse_quote_rows(content, format)
+            except ValueError as e:
+                return f"❌ Import annulé: {e}\n\nAucun devis n'a été enregistré."
+            if not rows:
+                return "📭 Aucun devis à importer."
+
+            # Validate the whole batch before touching the database
+            customers, products, quantities, unit_prices, errors = [], [], [], [], []
+            for line, row in rows:
+                try:
+                    customer_name = str(row.get("customer_name") or "").strip()
+                    product_name = str(row.get("product_name") or "").strip()
+                    if not customer_name or not product_name:
+                        raise ValueError("client et produit obligatoires")
+                    quantity = self._parse_number(row.get("quantity"), "quantité")
+                    if not quantity.is_integer() or quantity <= 0:
+                        raise ValueError(f"quantité invalide ({row.get('quantity')})")
+                    unit_price = self._parse_number(
+                        row.get("unit_price"), "prix unitaire"
+                    )
+                    if unit_price < 0:
+                        raise ValueError("prix unitaire négatif")
+                except ValueError as e:
+                    errors.append(f"Ligne {line}: {e}")
+                    continue
+                customers.append(customer_name)
+                products.append(product_name)
+                quantities.append(int(quantity))
+                unit_prices.append(unit_price)
+
+            if errors:
+                shown = "\n".join(errors[:10])
+                more = (
+                    f"\n... et {len(errors) - 10} autre(s)" if len(errors) > 10 else ""
+                )
+                return f"""❌ Import annulé, {len(errors)} ligne(s) invalide(s) sur {len(rows)}:
+
+{shown}{more}
+
+Aucun devis n'a été enregistré."""
+
+            # Compute the amounts of the whole batch in one pass
+            tax_rate = 0.20  # 20% TVA
+            subtotals = [q * p for q, p in zip(quantities, unit_prices)]
+            tax_amounts = [s * tax_rate for s in subtotals]
+            totals = [s + t for s, t in zip(subtotals, tax_amounts)]
+
+            # Allocate a block of IDs
+            first_id = self.quote_counter
+            self.quote_counter += len(subtotals)
+
+            timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+            valid_until = self._calculate_expiry_date()
+            sales_rep = __user__.get("name", "Inconnu")
+            sales_rep_email = __user__.get("email", "N/A")
+
+            batch = [
+                {
+                    "quote_id": f"DV-{first_id + i}",
+                    "customer_name": customers[i],
+                    "product_name": products[i],
+                    "quantity": quantities[i],
+                    "unit_price": unit_prices[i],
+                    "subtotal": subtotals[i],
+                    "tax_amount": tax_amounts[i],
+                    "total": totals[i],
+                    "sales_rep": sales_rep,
+                    "sales_rep_email": sales_rep_email,
+                    "status": "En Attente",
+                    "created_at": timestamp,
+                    "valid_until": valid_until,
+                }
+                for i in range(len(subtotals))
+            ]
+
+            # Store the whole batch at once
+            self.quotes_db.extend(batch)
+
+            return f"""✅ {len(batch)} Devis Importés avec Succès !
+
+N° Devis: DV-{first_id} à DV-{self.quote_counter - 1}
+---
+Sous-total: {sum(subtotals):.2f}€
+TVA (20%): {sum(tax_amounts):.2f}€
+Total: {sum(totals):.2f}€
+---
+Commercial: {sales_rep} ({sales_rep_email})
+Statut: En Attente
+Créé le: {timestamp}
+Valable jusqu'au: {valid_until}"""
+
+        except Exception as e:
+            return f"❌ Erreur lors de l'import des devis: {str(e)}"
+
+    async def export_quotes(
+        self,
+        format: str = "csv",
+        status: str = "tous",
+        chunk_size: int = 100,
+        __event_emitter__: Callable[[dict], Awaitable[None]] = None,
+    ) -> str:
+        """
+        Exporter les devis du système autonome de saisie des devis en CSV ou JSONL, par morceaux.
+        :param format: Le format d'export (csv, jsonl). Par défaut 'csv'.
+        :param status: Filtrer les devis par statut (tous, en attente, approuvé, rejeté). Par défaut 'tous'.
+        :param chunk_size: Le nombre de devis envoyés par morceau. Par défaut 100.
+        :return: Résumé de l'export, ou le contenu exporté si l'envoi par morceaux n'est pas disponible.
+        """
+        try:
+            format = format.lower()
+            if format not in ("csv", "jsonl"):
+                return "❌ Format invalide. Doit être l'un des suivants: csv, jsonl"
+
+            quotes = self._filter_quotes(status)
+            if not quotes:
+                return f"📭 Aucun devis trouvé avec le statut '{status}'."
+
+            chunks = self._iter_export_chunks(quotes, format, max(1, chunk_size))
+
+            # Without an event emitter there is no way to stream, return the content
+            if __event_emitter__ is None:
+                return "".join(chunks)
+
+            await __event_emitter__(
+                {"type": "message", "data": {"content": f"```{format}\n"}}
+            )
+            for chunk in chunks:
+                await __event_emitter__({"type": "message", "data": {"content": chunk}})
+            await __event_emitter__({"type": "message", "data": {"content": "```\n"}})
+
+            return f"✅ {len(quotes)} devis exportés au format {format.upper()}."
+
+        except Exception as e:
+            return f"❌ Erreur lors de l'export des devis: {str(e)}"
+
     def update_quote_status(
         self, quote_id: str, new_status: str, __user__: dict = {}
     ) -> str:
@@ -250,3 +392,183 @@ Mis à jour le: {quote['updated_at']}"""
 
         expiry = datetime.now() + timedelta(days=30)
         return expiry.strftime("%d/%m/%Y")
+
+    def _filter_quotes(self, status: str) -> list:
+        """
+        Méthode auxiliaire pour filtrer les devis par statut.
+        """
+        status_mapping = {
+            "tous": "all",
+            "en attente": "En Attente",
+            "approuvé": "Approuvé",
+            "rejeté": "Rejeté",
+            "terminé": "Terminé",
+        }
+
+        if status.lower() == "tous":
+            return self.quotes_db
+
+        status_filter = status_mapping.get(status.lower(), status)
+        return [q for q in self.quotes_db if q["status"] == status_filter]
+
+    def _parse_number(self, value, label: str) -> float:
+        """
+        Méthode auxiliaire pour lire un nombre saisi dans un tableur (1 234,50 ou 1234.50).
+        """
+        if value is None or str(value).strip() == "":
+            raise ValueError(f"{label} manquant(e)")
+        text = str(value)
+        for separator in (" ", "\u00a0", "\u202f", "€"):
+            text = text.replace(separator, "")
+        try:
+            number = float(text.replace(",", "."))
+        except ValueError:
+            raise ValueError(f"{label} invalide ({value})")
+        if not math.isfinite(number):
+            raise ValueError(f"{label} invalide ({value})")
+        return number
+
+    def _parse_quote_rows(self, content: str, format: str) -> list:
+        """
+        Méthode auxiliaire pour lire les lignes d'un import CSV ou JSON, avec leur numéro de ligne.
+        """
+        column_mapping = {
+            "customer name": "customer_name",
+            "customer": "customer_name",
+            "client": "customer_name",
+            "nom client": "customer_name",
+            "nom du client": "customer_name",
+            "societe": "customer_name",
+            "raison sociale": "customer_name",
+            "product name": "product_name",
+            "product": "product_name",
+            "produit": "product_name",
+            "article": "product_name",
+            "designation": "product_name",
+            "libelle": "product_name",
+            "quantity": "quantity",
+            "qty": "quantity",
+            "quantite": "quantity",
+            "qte": "quantity",
+            "nombre": "quantity",
+            "unit price": "unit_price",
+            "price": "unit_price",
+            "prix unitaire": "unit_price",
+            "prix unitaire ht": "unit_price",
+            "prix unit ht": "unit_price",
+            "prix ht": "unit_price",
+            "prix": "unit_price",
+            "pu": "unit_price",
+            "pu ht": "unit_price",
+            "tarif": "unit_price",
+        }
+        column_labels = {
+            "customer_name": "client",
+            "product_name": "produit",
+            "quantity": "quantité",
+            "unit_price": "prix unitaire",
+        }
+
+        def column(header) -> str:
+            # "Prix unitaire HT (€)" -> "prix unitaire ht"
+            header = unicodedata.normalize("NFKD", str(header))
+            header = "".join(c for c in header if not unicodedata.combining(c))
+            header = "".join(c if c.isalnum() else " " for c in header.lower())
+            return column_mapping.get(" ".join(header.split()))
+
+        def check_columns(headers):
+            found = {column(header) for header in headers}
+            missing = [
+                label for key, label in column_labels.items() if key not in found
+            ]
+            if missing:
+                raise ValueError(f"colonne(s) manquante(s): {', '.join(missing)}")
+
+        content = content.strip()
+        format = format.lower()
+        if format == "auto":
+            format = "json" if content[:1] in ("[", "{") else "csv"
+
+        if format == "json":
+            try:
+                if content.startswith("["):
+                    records = list(enumerate(json.loads(content), start=1))
+                else:
+                    records = [
+                        (line, json.loads(text))
+                        for line, text in enumerate(content.splitlines(), start=1)
+                        if text.strip()
+                    ]
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON invalide à la ligne {e.lineno}")
+            for line, record in records:
+                if not isinstance(record, dict):
+                    raise ValueError(
+                        f"ligne {line} invalide, un objet JSON est attendu"
+                    )
+            check_columns({key for _, record in records for key in record})
+        elif format == "csv":
+            header = content.splitlines()[0]
+            try:
+                delimiter = csv.Sniffer().sniff(header, delimiters=",;\t").delimiter
+            except csv.Error:
+                delimiter = ";" if ";" in header else ","
+            reader = csv.DictReader(io.StringIO(content), delimiter=delimiter)
+            check_columns(reader.fieldnames or [])
+            # line_num counts physical lines, including blank lines and multi-line fields
+            records = [(reader.line_num, record) for record in reader]
+        else:
+            raise ValueError("format invalide, doit être auto, csv ou json")
+
+        rows = []
+        for line, record in records:
+            row = {}
+            for key, value in record.items():
+                if key is None:
+                    continue
+                name = column(key)
+                if name:
+                    row[name] = value
+            rows.append((line, row))
+        return rows
+
+    def _iter_export_chunks(
+        self, quotes: list, format: str, chunk_size: int
+    ) -> Iterator[str]:
+        """
+        Méthode auxiliaire pour générer l'export morceau par morceau sans construire le fichier complet.
+        """
+        fields = [
+            "quote_id",
+            "customer_name",
+            "product_name",
+            "quantity",
+            "unit_price",
+            "subtotal",
+            "tax_amount",
+            "total",
+            "sales_rep",
+            "sales_rep_email",
+            "status",
+            "created_at",
+            "valid_until",
+        ]
+        money_fields = ["unit_price", "subtotal", "tax_amount", "total"]
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        if format == "csv":
+            writer.writeheader()
+
+        for start in range(0, len(quotes), chunk_size):
+            for quote in quotes[start : start + chunk_size]:
+                row = {field: quote.get(field) for field in fields}
+                for field in money_fields:
+                    row[field] = round(row[field], 2)
+                if format == "csv":
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(row, ensure_ascii=False) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
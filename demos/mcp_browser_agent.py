@@ -15,7 +15,17 @@ RAGARENN_IMT_API_KEY = os.getenv("RAGARENN_IMT_API_KEY")
 if not RAGARENN_IMT_API_KEY:
     raise ValueError("Rennes API Key not set - please check your .env file")
 
-ragarenn = OpenAI(base_url=RAGARENN_BASE_URL, api_key=RAGARENN_IMT_API_KEY)
+# Bound every call so a slow upstream cannot hang an agent step; the client
+# retries 429/5xx responses with jittered exponential backoff
+RAGARENN_TIMEOUT = 60.0
+RAGARENN_MAX_RETRIES = 3
+
+ragarenn = OpenAI(
+    base_url=RAGARENN_BASE_URL,
+    api_key=RAGARENN_IMT_API_KEY,
+    timeout=RAGARENN_TIMEOUT,
+    max_retries=RAGARENN_MAX_RETRIES,
+)
 
 # List available models from ragarenn
 try:
@@ -33,6 +43,7 @@ model = OpenAIServerModel(
     temperature=0.95,
     max_tokens=2048,
     flatten_messages_as_text=True,  # key workaround for picky servers
+    client_kwargs={"timeout": RAGARENN_TIMEOUT, "max_retries": RAGARENN_MAX_RETRIES},
 )
 
 # Initialize the web search tool
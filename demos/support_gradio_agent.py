@@ -1,6 +1,30 @@
 import gradio as gr
 import os
+from openai import OpenAI
 
 RAGARENN_IMT_API_KEY = os.environ["RAGARENN_IMT_API_KEY"]
 
-gr.load_chat("https://ragarenn.eskemm-numerique.fr/sso/instance@imt/api/", model="support-disi", token=RAGARENN_IMT_API_KEY).launch(pwa=True, share=True)
+# gr.load_chat does not expose the client timeout, so the client is built here:
+# every call is bounded and 429/5xx responses are retried with jittered backoff
+ragarenn = OpenAI(
+    base_url="https://ragarenn.eskemm-numerique.fr/sso/instance@imt/api/",
+    api_key=RAGARENN_IMT_API_KEY,
+    timeout=60.0,
+    max_retries=3,
+)
+
+
+def respond(message, history):
+    messages = [{"role": m["role"], "content": m["content"]} for m in history]
+    messages.append({"role": "user", "content": message})
+    stream = ragarenn.chat.completions.create(
+        model="support-disi", messages=messages, stream=True
+    )
+    response = ""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            response += chunk.choices[0].delta.content
+            yield response
+
+
+gr.ChatInterface(respond, type="messages").launch(pwa=True, share=True)